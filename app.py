@@ -1,14 +1,184 @@
 import streamlit as st
 import pandas as pd
+import ast
+import io
 import os
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from datetime import datetime
 
 # Import our helper modules from the utils package
 from utils import eda, cleaning, llm
 
-# Global log to track transformation steps (used for export)
+# Global log of structured (op, *args) transformation steps, rendered to source on export
 transformation_log = []
 
+# Tokens treated as missing when reading uploaded CSV files (pandas' read_csv defaults)
+CSV_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+# Timestamp formats recognized when reading uploaded CSV files
+CSV_TIMESTAMP_PARSERS = [pacsv.ISO8601]
+
+def dedupe_column_names(names):
+    """
+    Rename duplicate column names the way pd.read_csv does ('a', 'a.1', 'a.2', ...).
+    """
+    original = set(names)
+    counts = {}
+    deduped = []
+    for name in names:
+        base = name
+        count = counts.get(base, 0)
+        while count > 0:
+            counts[base] = count + 1
+            name = f"{base}.{count}"
+            # Skip suffixed names that already appear in the header
+            count = count + 1 if name in original else counts.get(name, 0)
+        deduped.append(name)
+        counts[name] = count + 1
+    return deduped
+
+def optimize_dtypes(df):
+    """
+    Downcast integer columns and convert the DataFrame to PyArrow-backed dtypes.
+    Float columns keep their precision, all-empty (null-typed) columns become floats
+    as they would with pandas, and object columns holding mixed types (which Arrow
+    cannot represent) are stored as Arrow strings.
+    """
+    null_cols = [
+        col for col, dtype in df.dtypes.items()
+        if isinstance(dtype, pd.ArrowDtype) and pa.types.is_null(dtype.pyarrow_dtype)
+    ]
+    if null_cols:
+        df = df.astype({col: 'double[pyarrow]' for col in null_cols})
+    for col in df.select_dtypes(include=['integer']).columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    # Keep float columns as floats so that mean imputation is not truncated.
+    df = df.convert_dtypes(dtype_backend='pyarrow', convert_integer=False)
+    # Only mixed-type columns need coercing; homogeneous ones (bytes, decimals) are left as is.
+    mixed_cols = [
+        col for col in df.select_dtypes(include=['object']).columns
+        if pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed')
+    ]
+    for col in mixed_cols:
+        df[col] = df[col].astype('string[pyarrow]')
+    return df
+
+@st.cache_data
+def load_and_summarize(file_bytes):
+    """
+    Parse the uploaded CSV bytes and compute the initial summary and null counts.
+    Cached on the file contents, so reruns for the same upload skip the whole pipeline.
+    Returns (df, date_columns, summary, null_counts).
+    """
+    try:
+        # Parse with PyArrow's multi-threaded reader; ISO-formatted dates are detected automatically
+        table = pacsv.read_csv(
+            pa.BufferReader(file_bytes),
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(
+                null_values=CSV_NULL_VALUES,
+                strings_can_be_null=True,
+                timestamp_parsers=CSV_TIMESTAMP_PARSERS,
+            ),
+        )
+        # Arrow keeps duplicate header names; rename them so each column is addressable
+        table = table.rename_columns(dedupe_column_names(table.column_names))
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
+    except pa.ArrowInvalid:
+        # Arrow rejects files pandas accepts, e.g. short rows that pandas fills with NaN
+        df = pd.read_csv(io.BytesIO(file_bytes), dtype_backend='pyarrow')
+
+    # Arrow loads text that is not valid UTF-8 as binary, which cannot be analyzed or exported
+    binary_cols = [
+        col for col, dtype in df.dtypes.items()
+        if isinstance(dtype, pd.ArrowDtype) and pa.types.is_binary(dtype.pyarrow_dtype)
+    ]
+    if binary_cols:
+        raise ValueError(
+            f"Columns {binary_cols} are not valid UTF-8 text. Please re-save the file as UTF-8."
+        )
+
+    # Columns named like dates in other formats are still parsed when possible
+    date_mask = df.columns.str.contains('date', case=False, regex=False)
+    for col in df.columns[date_mask]:
+        if df[col].dtype.kind in 'OSU':
+            try:
+                df[col] = pd.to_datetime(df[col])
+            except (ValueError, TypeError):
+                pass
+
+    # Switch to compact, Arrow-backed dtypes
+    df = optimize_dtypes(df)
+    date_columns = [col for col, dtype in df.dtypes.items() if dtype.kind == 'M']
+
+    summary = eda.generate_summary(df)
+    null_counts = eda.missing_data_counts(df)
+    return df, date_columns, summary, null_counts
+
+def is_import(node):
+    """
+    Return True if the AST node is an import statement that can be hoisted.
+    __future__ imports are excluded, since they must stay with the code they affect.
+    """
+    if isinstance(node, ast.ImportFrom) and node.module == '__future__':
+        return False
+    return isinstance(node, (ast.Import, ast.ImportFrom))
+
+def is_main_guard(node):
+    """
+    Return True if the AST node is an `if __name__ == "__main__":` block.
+    """
+    return (
+        isinstance(node, ast.If)
+        and isinstance(node.test, ast.Compare)
+        and isinstance(node.test.left, ast.Name)
+        and node.test.left.id == '__name__'
+        and len(node.test.comparators) == 1
+        and isinstance(node.test.comparators[0], ast.Constant)
+        and node.test.comparators[0].value == '__main__'
+    )
+
+def load_additional_checks(code_str):
+    """
+    Parse, validate and execute the LLM-generated code once per distinct code string,
+    caching the resulting namespace in session state. `if __name__ == "__main__":` blocks
+    are dropped. Import statements (at module level and at the top level of
+    'additional_checks') are hoisted and run once up front, so calling the function
+    does not go through the import machinery again.
+    Returns the 'additional_checks' function, or None if the code does not define it.
+    """
+    key = hash(code_str)
+    if st.session_state.get('llm_code_key') != key:
+        tree = ast.parse(code_str, "<llm>")
+        # The app calls additional_checks itself; script entry points are not run.
+        tree.body = [node for node in tree.body if not is_main_guard(node)]
+        checks_defs = [
+            node for node in tree.body
+            if isinstance(node, ast.FunctionDef) and node.name == 'additional_checks'
+        ]
+        # Do not execute code that does not define the expected function.
+        if not checks_defs:
+            return None
+
+        imports = [node for node in tree.body if is_import(node)]
+        rest = [node for node in tree.body if not is_import(node)]
+        for func in checks_defs:
+            imports.extend(node for node in func.body if is_import(node))
+            func.body = [node for node in func.body if not is_import(node)] or [ast.Pass()]
+
+        namespace = {}
+        imports_module = ast.fix_missing_locations(ast.Module(body=imports, type_ignores=[]))
+        body_module = ast.fix_missing_locations(ast.Module(body=rest, type_ignores=[]))
+        exec(compile(imports_module, "<llm-imports>", "exec"), namespace)
+        exec(compile(body_module, "<llm-body>", "exec"), namespace)
+        st.session_state.llm_namespace = namespace
+        st.session_state.llm_code_key = key
+    return st.session_state.llm_namespace.get('additional_checks')
+
 def export_transformation_script(log):
     """
     Create a Python script file containing the transformation steps.
@@ -22,7 +192,7 @@ def export_transformation_script(log):
         "def transform_data(df):",
         "    # Transformation steps applied",
     ]
-    for step in log:
+    for step in cleaning.render_transformation_log(log):
         # Each transformation line is indented inside the function.
         script_lines.append("    " + step)
     script_lines.append("    return df")
@@ -33,11 +203,26 @@ def export_transformation_script(log):
         f.write(script_content)
     return export_path
 
-def export_eda_report(df, log):
+def export_cleaned_data(df, file_format):
+    """
+    Save the cleaned DataFrame as CSV (via PyArrow's multi-threaded writer) or as
+    zstd-compressed Parquet.
+    """
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    if file_format == "Parquet":
+        export_path = os.path.join("export", f"cleaned_data_{timestamp}.parquet")
+        df.to_parquet(export_path, index=False, compression='zstd')
+    else:
+        export_path = os.path.join("export", f"cleaned_data_{timestamp}.csv")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pacsv.write_csv(table, export_path, write_options=pacsv.WriteOptions(include_header=True))
+    return export_path
+
+def export_eda_report(summary, log):
     """
     Generate an HTML EDA report using a Jinja2 template and save it.
     """
-    report_html = eda.generate_eda_report(df, log)
+    report_html = eda.generate_eda_report(summary, cleaning.render_transformation_log(log))
     report_path = os.path.join("export", f"eda_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html")
     with open(report_path, "w") as f:
         f.write(report_html)
@@ -58,50 +243,31 @@ def main():
     # --- Main Section ---
     if uploaded_file is not None:
         try:
-            # First read the CSV without date parsing to check columns
-            df = pd.read_csv(uploaded_file, low_memory=False)
-            
-            # Reset the file pointer
-            uploaded_file.seek(0)
-            
-            # Check if 'Date' column exists
-            date_columns = [col for col in df.columns if 'date' in col.lower()]
-            
+            df, date_columns, summary, null_counts = load_and_summarize(uploaded_file.getvalue())
+
             if date_columns:
-                # Read CSV with date parsing for found date columns
-                df = pd.read_csv(uploaded_file, low_memory=False, parse_dates=date_columns)
                 st.info(f"Date parsing applied to columns: {', '.join(date_columns)}")
             else:
-                # Read CSV without date parsing
-                df = pd.read_csv(uploaded_file, low_memory=False)
                 st.warning("No date columns detected in the dataset")
             
-            # Convert object columns to string type, except for date columns
-            for col in df.select_dtypes(['object']).columns:
-                if col not in date_columns:
-                    df[col] = df[col].astype(str)
-            
             st.subheader("Data Preview")
             st.dataframe(df.head())
             
             st.subheader("Initial EDA Summary")
-            summary = eda.generate_summary(df)
             st.write(summary)
             
             st.subheader("Missing Data Visualization")
-            missing_fig = eda.generate_missing_data_plot(df)
-            st.pyplot(missing_fig)
+            st.bar_chart(null_counts)
             
             st.subheader("ML Readiness Check")
-            readiness_messages = eda.check_ml_readiness(df, ml_task)
+            readiness_messages = eda.check_ml_readiness(df, ml_task, null_counts=null_counts, n=len(df))
             for message in readiness_messages:
                 st.info(message)
             
             # --- LLM-Powered Cleaning Suggestions ---
             if st.button("Get LLM Cleaning Suggestions"):
-                suggestion = llm.get_cleaning_suggestions(summary.to_string(), ml_task)
                 st.subheader("LLM Cleaning Suggestions")
-                st.write(suggestion)
+                st.write_stream(llm.get_cleaning_suggestions_stream(summary.to_string(), ml_task))
             
             st.subheader("Data Cleaning Options")
             # Checkbox to impute missing values
@@ -118,14 +284,14 @@ def main():
             
             st.subheader("Updated EDA")
             updated_summary = eda.generate_summary(df)
+            updated_null_counts = eda.missing_data_counts(df)
             st.write(updated_summary)
             
             st.subheader("Updated Missing Data Visualization")
-            updated_missing_fig = eda.generate_missing_data_plot(df)
-            st.pyplot(updated_missing_fig)
+            st.bar_chart(updated_null_counts)
             
             st.subheader("ML Readiness Check (After Cleaning)")
-            updated_readiness_messages = eda.check_ml_readiness(df, ml_task)
+            updated_readiness_messages = eda.check_ml_readiness(df, ml_task, null_counts=updated_null_counts, n=len(df))
             for message in updated_readiness_messages:
                 st.info(message)
             
@@ -138,13 +304,11 @@ def main():
             
             if st.button("Run Additional Checks Code"):
                 if st.session_state.llm_code:
-                    code_str = st.session_state.llm_code
-                    local_namespace = {}
                     try:
-                        exec(code_str, local_namespace)
-                        if 'additional_checks' in local_namespace:
+                        additional_checks = load_additional_checks(st.session_state.llm_code)
+                        if additional_checks is not None:
                             st.info("Running additional_checks...")
-                            local_namespace['additional_checks'](df)
+                            additional_checks(df)
                         else:
                             st.error("The provided code does not define a function named 'additional_checks'.")
                     except Exception as e:
@@ -154,17 +318,17 @@ def main():
             
             # --- Export Options ---
             st.subheader("Export Options")
-            if st.button("Export Cleaned Data as CSV"):
-                csv_export_path = os.path.join("export", f"cleaned_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
-                df.to_csv(csv_export_path, index=False)
-                st.success(f"Cleaned data exported to {csv_export_path}")
+            export_format = st.radio("Cleaned data format", ["CSV", "Parquet"], horizontal=True)
+            if st.button("Export Cleaned Data"):
+                data_export_path = export_cleaned_data(df, export_format)
+                st.success(f"Cleaned data exported to {data_export_path}")
             
             if st.button("Export Transformation Script"):
                 script_path = export_transformation_script(transformation_log)
                 st.success(f"Transformation script exported to {script_path}")
             
             if st.button("Export EDA Report (HTML)"):
-                report_path = export_eda_report(df, transformation_log)
+                report_path = export_eda_report(updated_summary, transformation_log)
                 st.success(f"EDA report exported to {report_path}")
 
         except Exception as e:
@@ -1,17 +1,66 @@
+import math
+import numpy as np
 import pandas as pd
+from numba import njit, prange
+
+# Renderers turning structured (op, *args) log entries into transformation source lines
+TRANSFORMATION_TEMPLATES = {
+    "fillna_mean": lambda cols: (
+        f"df = df.fillna(df[{cols}].mean().to_dict())  # Imputed missing values in {cols}"
+    ),
+    "drop_duplicates": lambda initial_shape, final_shape: (
+        f"df.drop_duplicates(inplace=True)  # Dropped duplicates. Shape from {initial_shape} to {final_shape}"
+    ),
+}
+
+def render_transformation_log(transformation_log):
+    """
+    Render the structured transformation log into Python source lines.
+    """
+    return [TRANSFORMATION_TEMPLATES[op](*args) for op, *args in transformation_log]
+
+@njit(parallel=True, cache=True)
+def _fill_column_means(values):
+    """
+    Replace NaNs in each column of a 2-D float64 array with that column's mean, in place.
+    Columns are processed in parallel; all-NaN columns are left unchanged.
+    """
+    n_rows, n_cols = values.shape
+    for j in prange(n_cols):
+        total = 0.0
+        count = 0
+        for i in range(n_rows):
+            v = values[i, j]
+            if not math.isnan(v):
+                total += v
+                count += 1
+        if count == 0:
+            continue
+        mean = total / count
+        for i in range(n_rows):
+            if math.isnan(values[i, j]):
+                values[i, j] = mean
 
 def impute_missing_values(df, transformation_log):
     """
     Impute missing values in numeric columns using the column mean.
     Log the transformation step.
     """
-    numeric_cols = df.select_dtypes(include=['number']).columns
-    for col in numeric_cols:
-        if df[col].isnull().sum() > 0:
-            df[col].fillna(df[col].mean(), inplace=True)
-            transformation_log.append(
-                f"df['{col}'].fillna(df['{col}'].mean(), inplace=True)  # Imputed missing values in '{col}'"
-            )
+    numeric_df = df.select_dtypes(include=['number'])
+    # Single pass over the numeric block to find columns with missing values
+    needs_fill = numeric_df.columns[numeric_df.isna().any().values]
+    if len(needs_fill) > 0:
+        # Mean and fill in one fused pass over the raw float64 block
+        values = numeric_df[needs_fill].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+        _fill_column_means(values)
+        filled = pd.DataFrame(values, index=df.index, columns=needs_fill)
+        # Float columns keep their dtype; nullable integer columns become floats to hold the means
+        target_dtypes = {
+            col: dtype if dtype.kind == 'f' else 'double[pyarrow]'
+            for col, dtype in numeric_df[needs_fill].dtypes.items()
+        }
+        df[needs_fill] = filled.astype(target_dtypes)
+        transformation_log.append(("fillna_mean", list(needs_fill)))
     return df
 
 def drop_duplicates(df, transformation_log):
@@ -20,8 +69,13 @@ def drop_duplicates(df, transformation_log):
     Log the transformation step.
     """
     initial_shape = df.shape
-    df.drop_duplicates(inplace=True)
-    transformation_log.append(
-        f"df.drop_duplicates(inplace=True)  # Dropped duplicates. Shape from {initial_shape} to {df.shape}"
-    )
+    # Rows with a unique row hash cannot be duplicates, so only rows sharing a hash
+    # are compared exactly; this also guards against hash collisions.
+    row_hashes = pd.util.hash_pandas_object(df, index=False)
+    candidates = row_hashes.duplicated(keep=False).to_numpy()
+    if candidates.any():
+        is_duplicate = np.zeros(len(df), dtype=bool)
+        is_duplicate[candidates] = df[candidates].duplicated().to_numpy()
+        df = df[~is_duplicate]
+    transformation_log.append(("drop_duplicates", initial_shape, df.shape))
     return df
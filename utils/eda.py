@@ -1,36 +1,69 @@
+import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from jinja2 import Environment, FileSystemLoader
 import os
+import hashlib
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
+# Row order of the combined numeric/non-numeric summary
+SUMMARY_ROW_ORDER = ["count", "unique", "top", "freq", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+# Readiness message template per dtype kind (object, bytes, str, datetime)
+DTYPE_KIND_MESSAGES = {
+    'O': "Column '{}' is categorical/text type and may need encoding.",
+    'S': "Column '{}' is categorical/text type and may need encoding.",
+    'U': "Column '{}' is categorical/text type and may need encoding.",
+    'M': "Column '{}' is a datetime and may need feature engineering.",
+}
+
+def frame_fingerprint(df):
+    """
+    Hash every row of the DataFrame, together with its columns and dtypes.
+    Used as the cache key for DataFrames, since Streamlit's default hash only
+    samples large frames and misses in-place edits such as imputation.
+    """
+    row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    digest = hashlib.sha256(row_hashes.tobytes()).hexdigest()
+    return (tuple(df.columns), tuple(str(dtype) for dtype in df.dtypes), digest)
+
+@st.cache_data(hash_funcs={pd.DataFrame: frame_fingerprint})
 def generate_summary(df):
     """
     Return descriptive statistics (including non-numeric columns) for the DataFrame.
+    Numeric and non-numeric columns are described in parallel threads and recombined.
+    Results are cached across Streamlit reruns, keyed on the full frame contents.
     """
-    return df.describe(include='all')
+    numeric_df = df.select_dtypes(include=['number'])
+    other_df = df.select_dtypes(exclude=['number'])
+    # Nothing to split for single-kind frames
+    if len(numeric_df.columns) == 0 or len(other_df.columns) == 0:
+        return df.describe(include='all')
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        numeric_future = executor.submit(numeric_df.describe)
+        other_future = executor.submit(other_df.describe, include='all')
+    summary = pd.concat([numeric_future.result(), other_future.result()], axis=1)
+    rows = [row for row in SUMMARY_ROW_ORDER if row in summary.index]
+    rows += [row for row in summary.index if row not in rows]
+    return summary.loc[rows, df.columns]
 
-def generate_missing_data_plot(df):
+def missing_data_counts(df):
     """
-    Generate a bar plot showing the count of missing values per column.
+    Return the count of missing values per column.
     """
-    missing_counts = df.isnull().sum()
-    fig, ax = plt.subplots()
-    sns.barplot(x=missing_counts.index, y=missing_counts.values, ax=ax)
-    ax.set_title("Missing Data Count per Column")
-    ax.set_ylabel("Count")
-    ax.set_xticklabels(ax.get_xticklabels(), rotation=45, ha='right')
-    return fig
+    return df.isnull().sum()
 
-def generate_eda_report(df, transformation_log):
+def generate_eda_report(summary, transformation_log):
     """
     Generate an HTML report using a Jinja2 template.
+    Expects the precomputed summary from generate_summary().
     """
     env = Environment(loader=FileSystemLoader(searchpath=os.path.join(os.getcwd(), "templates")))
     template = env.get_template("report_template.html")
     
     # Convert summary to HTML table.
-    summary_html = df.describe(include='all').to_html(classes="table table-striped")
+    summary_html = summary.to_html(classes="table table-striped")
     
     report_html = template.render(
         title="EDA Report",
@@ -39,28 +72,33 @@ def generate_eda_report(df, transformation_log):
     )
     return report_html
 
-def check_ml_readiness(df, ml_task):
+def check_ml_readiness(df, ml_task, null_counts=None, n=None):
     """
     Check if the dataset is ready for the selected ML task by evaluating:
       - Missing data percentage,
       - Constant columns,
       - (For decision trees) presence of numeric data.
+    Pass precomputed null_counts and row count n to skip rescanning the DataFrame.
     Returns a list of messages.
     """
-    messages = []
-    missing = df.isnull().mean()
+    if null_counts is None:
+        null_counts = missing_data_counts(df)
+    if n is None:
+        n = len(df)
+    cols = df.columns.to_numpy()
     
-    # Use items() instead of iteritems()
-    for col, pct in missing.items():
-        if pct > 0:
-            messages.append(f"Column '{col}' has {pct*100:.1f}% missing values.")
+    # Build the missing-data messages from a boolean mask over the percentages
+    pcts = null_counts.to_numpy(dtype=float) / n if n else np.zeros(len(cols))
+    messages = [f"Column '{cols[i]}' has {pcts[i]*100:.1f}% missing values." for i in np.flatnonzero(pcts > 0)]
     
     # Check data types
-    for col, dtype in df.dtypes.items():
-        if dtype == 'object':
-            messages.append(f"Column '{col}' is categorical/text type and may need encoding.")
-        elif dtype == 'datetime64[ns]':
-            messages.append(f"Column '{col}' is a datetime and may need feature engineering.")
+    # Match on dtype kind so that both NumPy and PyArrow-backed dtypes are covered
+    kinds = df.dtypes.map(lambda dtype: dtype.kind).to_numpy()
+    messages += [
+        template.format(col)
+        for col, kind in zip(cols, kinds)
+        if (template := DTYPE_KIND_MESSAGES.get(kind))
+    ]
     
     # Add ML task specific checks
     if ml_task == "Decision Tree":
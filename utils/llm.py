@@ -1,16 +1,61 @@
 import os
 from openai import OpenAI
 
-def get_cleaning_suggestions(data_summary, ml_task):
+from utils import llm_cache
+
+MODEL = "gpt-3.5-turbo"
+
+# Create the client once at import time instead of on every call.
+_API_KEY = os.getenv("OPENAI_API_KEY")
+_CLIENT = OpenAI(api_key=_API_KEY) if _API_KEY else None
+
+# Generated code is only reused on an exact prompt match: a similar summary from a
+# different upload would otherwise return code written for other columns.
+@llm_cache.cached(semantic=False)
+def _create_completion(client, task, ml_task, model, prompt, max_tokens, temperature):
+    """
+    Send a single-message chat completion request and return the stripped response text.
+    Responses are cached per task and ML task by utils.llm_cache.
+    """
+    response = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=max_tokens,
+        temperature=temperature,
+    )
+    return response.choices[0].message.content.strip()
+
+@llm_cache.cached_stream(semantic=True)
+def _stream_completion(client, task, ml_task, model, prompt, max_tokens, temperature):
     """
-    Use OpenAI's API to get cleaning suggestions based on the data summary.
+    Send a single-message chat completion request and yield the response text as it arrives.
+    Responses are cached per task and ML task by utils.llm_cache.
+    """
+    stream = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=max_tokens,
+        temperature=temperature,
+        stream=True,
+    )
+    for chunk in stream:
+        if chunk.choices:
+            yield chunk.choices[0].delta.content or ""
+
+def get_cleaning_suggestions_stream(data_summary, ml_task):
+    """
+    Use OpenAI's API to get cleaning suggestions based on the data summary, yielding the
+    suggestion text as it arrives (for use with st.write_stream()).
     Ensure that the environment variable OPENAI_API_KEY is set.
     """
-    openai_api_key = os.get_env("OPEN_AI_KEY")    
-    if not openai_api_key:
-        return "OpenAI API key not set. Please set the OPENAI_API_KEY environment variable."
+    if _CLIENT is None:
+        yield "OpenAI API key not set. Please set the OPENAI_API_KEY environment variable."
+        return
     
-    client = OpenAI(api_key=openai_api_key)
     prompt = (
         "Given the following data summary:\n\n"                                 
         f"{data_summary}\n\n"
@@ -19,29 +64,22 @@ def get_cleaning_suggestions(data_summary, ml_task):
     )
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
+        yield from _stream_completion(
+            _CLIENT, "cleaning_suggestions", ml_task, MODEL, prompt,
             max_tokens=150,
-            temperature=0.7,
+            temperature=0,
         )
-        suggestion = response.choices[0].message.content.strip()
-        return suggestion
     except Exception as e:
-        return f"Error fetching LLM suggestions: {e}"
+        yield f"Error fetching LLM suggestions: {e}"
 
 def get_additional_checks(data_summary, ml_task):
     """
     Use OpenAI's API to get additional visualization/check code suggestions based on the data summary and ML task.
     The prompt instructs the LLM to provide complete, runnable Python code that defines a function named 'additional_checks(df)'.
     """
-    openai_api_key = os.get_env("OPEN_AI_KEY")  
-    if not openai_api_key:
+    if _CLIENT is None:
         return "OpenAI API key not set. Please set the OPENAI_API_KEY environment variable."
     
-    client = OpenAI(api_key=openai_api_key)
     prompt = (
         "Given the following data summary:\n\n"
         f"{data_summary}\n\n"
@@ -52,15 +90,11 @@ def get_additional_checks(data_summary, ml_task):
     )
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
+        code = _create_completion(
+            _CLIENT, "additional_checks", ml_task, MODEL, prompt,
             max_tokens=300,
             temperature=0.7,
         )
-        code = response.choices[0].message.content.strip()
         return code
     except Exception as e:
         return f"Error fetching additional checks: {e}"
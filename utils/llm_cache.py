@@ -0,0 +1,123 @@
+import functools
+import hashlib
+import json
+import numpy as np
+from diskcache import Cache
+
+# Disk-backed store shared by all LLM calls
+_cache = Cache("./cache")
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+SIMILARITY_THRESHOLD = 0.92
+# Maximum number of (embedding, response) pairs kept per model/task/ML task
+MAX_SEMANTIC_ENTRIES = 200
+
+def _exact_key(model, prompt, task, ml_task):
+    """
+    Build a SHA256 key from the model, prompt, task and ML task.
+    """
+    payload = json.dumps({"model": model, "prompt": prompt, "task": task, "ml_task": ml_task}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _embeddings_key(model, task, ml_task):
+    """
+    Key under which the (embedding, response) pairs for a model/task/ML task are stored.
+    Keeping ML tasks apart stops prompts that differ only in the task from matching.
+    """
+    return f"embeddings:{task}:{ml_task}:{model}"
+
+def _embed(client, prompt):
+    """
+    Return the unit-normalized embedding of the prompt.
+    """
+    response = client.embeddings.create(model=EMBEDDING_MODEL, input=prompt)
+    vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+def _semantic_lookup(model, task, ml_task, embedding):
+    """
+    Return the cached response whose prompt embedding is most similar to the given one,
+    if its cosine similarity exceeds SIMILARITY_THRESHOLD.
+    """
+    entries = _cache.get(_embeddings_key(model, task, ml_task), [])
+    if not entries:
+        return None
+    matrix = np.stack([vector for vector, _ in entries])
+    similarities = matrix @ embedding
+    best = int(np.argmax(similarities))
+    if similarities[best] > SIMILARITY_THRESHOLD:
+        return entries[best][1]
+    return None
+
+def _store(model, task, ml_task, prompt, embedding, response):
+    """
+    Store a response under its exact key and, when available, its prompt embedding.
+    Only the most recent MAX_SEMANTIC_ENTRIES embeddings are kept.
+    """
+    _cache.set(_exact_key(model, prompt, task, ml_task), response)
+    if embedding is not None:
+        key = _embeddings_key(model, task, ml_task)
+        with _cache.transact():
+            entries = _cache.get(key, [])
+            entries.append((embedding, response))
+            _cache.set(key, entries[-MAX_SEMANTIC_ENTRIES:])
+
+def _lookup(client, task, ml_task, model, prompt, semantic):
+    """
+    Look up a cached response, first by exact key and then, if semantic is True, by
+    prompt similarity. Returns (response, embedding); response is None on a miss, and
+    embedding is None when embeddings are disabled, unavailable or were not needed.
+    """
+    response = _cache.get(_exact_key(model, prompt, task, ml_task))
+    if response is not None or not semantic:
+        return response, None
+
+    try:
+        embedding = _embed(client, prompt)
+    except Exception:
+        # Fall back to exact-match caching only if embeddings are unavailable.
+        return None, None
+    return _semantic_lookup(model, task, ml_task, embedding), embedding
+
+def cached(semantic=True):
+    """
+    Decorator factory for completion calls with the signature
+    fn(client, task, ml_task, model, prompt, **kwargs).
+    Checks for an exact prompt match first, then (if semantic is True) for a semantically
+    similar prompt, and only calls fn on a miss. Exceptions raised by fn are not cached.
+    Disable semantic matching when a near-miss answer would be wrong, e.g. generated code.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(client, task, ml_task, model, prompt, **kwargs):
+            response, embedding = _lookup(client, task, ml_task, model, prompt, semantic)
+            if response is not None:
+                return response
+
+            response = fn(client, task, ml_task, model, prompt, **kwargs)
+            _store(model, task, ml_task, prompt, embedding, response)
+            return response
+        return wrapper
+    return decorator
+
+def cached_stream(semantic=True):
+    """
+    Streaming counterpart of cached() for generator functions that yield text chunks.
+    A cache hit is yielded as a single chunk; on a miss the chunks are passed through
+    and the full response is stored only once the stream completes.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(client, task, ml_task, model, prompt, **kwargs):
+            response, embedding = _lookup(client, task, ml_task, model, prompt, semantic)
+            if response is not None:
+                yield response
+                return
+
+            chunks = []
+            for chunk in fn(client, task, ml_task, model, prompt, **kwargs):
+                chunks.append(chunk)
+                yield chunk
+            _store(model, task, ml_task, prompt, embedding, "".join(chunks).strip())
+        return wrapper
+    return decorator